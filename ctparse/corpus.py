@@ -1,8 +1,20 @@
 import json
 import logging
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import groupby
 from typing import (
+    Any,
     Callable,
+    Deque,
+    Dict,
+    Generator,
     Iterable,
     Iterator,
     List,
@@ -16,6 +28,20 @@ from typing import (
 
 from tqdm import tqdm
 
+try:
+    import ijson
+
+    _HAS_IJSON = True
+except ImportError:  # pragma: no cover
+    _HAS_IJSON = False
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # pragma: no cover
+    _HAS_ORJSON = False
+
 from ctparse.ctparse import ctparse_gen, CTParse
 from ctparse.scorer import DummyScorer, Scorer
 from ctparse.types import Artifact, Duration, Interval, Time
@@ -29,7 +55,38 @@ TimeParseEntry = NamedTuple(
     [("text", str), ("ts", datetime), ("gold", Artifact)],
 )
 
+# Counters of a corpus run, see iter_corpus_samples
+_CorpusStats = NamedTuple(
+    "_CorpusStats",
+    [
+        ("total_tests", int),
+        ("pos_parses", int),
+        ("neg_parses", int),
+        ("pos_first_parses", int),
+        ("pos_best_scored", int),
+    ],
+)
+
 T = TypeVar("T")
+R = TypeVar("R")
+
+
+class CorpusFailure(Exception):
+    """Raised if ctparse does not produce the target of a corpus entry."""
+
+
+# Parsers for the no-bound string representation, keyed by its prefix
+_NB_STRING_PARSERS = {
+    "Time[]": Time.from_str,
+    "Interval[]": Interval.from_str,
+    "Duration[]": Duration.from_str,
+}  # type: Dict[str, Callable[[str], Union[Time, Interval, Duration]]]
+
+# Interned string representation of the rules in a production, see _rule_str
+_RULE_STR_CACHE = {}  # type: Dict[Union[int, str], str]
+
+# Scorer for parses memoized by _ctparse_gen_dummy_scorer
+_DUMMY_SCORER = DummyScorer()
 
 
 def make_partial_rule_dataset(
@@ -39,6 +96,7 @@ def make_partial_rule_dataset(
     max_stack_depth: int,
     relative_match_len: float = 1.0,
     progress: bool = False,
+    max_workers: Optional[int] = None,
 ) -> Iterable[Tuple[List[str], bool]]:
     """Build a data set from an iterable of TimeParseEntry.
 
@@ -51,6 +109,12 @@ def make_partial_rule_dataset(
 
     If `progress` is ``True``, display a progress bar.
 
+    Entries are parsed in parallel using up to `max_workers` processes (defaults
+    to the number of CPUs), hence `scorer` must be picklable. Parsing runs ahead
+    of the consumer by a few chunks of entries per process, the samples are
+    yielded in the order of `entries`. With `max_workers=1`, or only a few
+    entries, they are parsed lazily in this process.
+
     Example:
 
     rule sequence: [r1, r2, r3]
@@ -70,66 +134,239 @@ def make_partial_rule_dataset(
     # of (text, reference_time, rule_ids) quite easily, because the rule is a linear
     # list.
 
+    parse_entries = partial(
+        _parse_entries,
+        scorer=scorer,
+        timeout=timeout,
+        max_stack_depth=max_stack_depth,
+        relative_match_len=relative_match_len,
+    )
+    chunksize = 16
+    n_workers = 1 if len(entries) <= chunksize else _n_workers(max_workers)
+    chunks = ((entries[i : i + chunksize],) for i in range(0, len(entries), chunksize))
+    results = _ordered_starmap(parse_entries, chunks, n_workers)
+    entries_samples = zip(
+        entries, (samples for chunk in results for samples in chunk)
+    )  # type: Iterable[Tuple[TimeParseEntry, List[Tuple[List[str], bool]]]]
     if progress:
-        entries_it = _progress_bar(
-            entries,
+        entries_samples = _progress_bar(
+            entries_samples,
             total=len(entries),
-            status_text=lambda entry: "  {: <70}".format(entry.text),
+            status_text=lambda result: "  {: <70}".format(result[0].text),
         )
-    else:
-        entries_it = entries
+    try:
+        for _, samples in entries_samples:
+            if n_workers != 1:
+                _intern_rules(X for X, _ in samples)
+            yield from samples
+    finally:
+        # cancel the chunks that are not parsed yet
+        results.close()
+
 
-    for entry in entries_it:
-        for parse in ctparse_gen(
-            entry.text,
-            entry.ts,
+def _parse_entries(
+    entries: Sequence[TimeParseEntry],
+    scorer: Scorer,
+    timeout: Union[float, int],
+    max_stack_depth: int,
+    relative_match_len: float,
+) -> List[List[Tuple[List[str], bool]]]:
+    return [
+        _parse_entry(entry, scorer, timeout, max_stack_depth, relative_match_len)
+        for entry in entries
+    ]
+
+
+def _parse_entry(
+    entry: TimeParseEntry,
+    scorer: Scorer,
+    timeout: Union[float, int],
+    max_stack_depth: int,
+    relative_match_len: float,
+) -> List[Tuple[List[str], bool]]:
+    samples = []
+    for parse in _ctparse_gen_cached(
+        entry.text,
+        entry.ts,
+        relative_match_len=relative_match_len,
+        timeout=timeout,
+        max_stack_depth=max_stack_depth,
+        scorer=scorer,
+    ):
+        # TODO: we should make sure ctparse_gen never returns None. If there is no
+        # result it should return an empty list
+        if parse is None:
+            continue
+
+        y = parse.resolution == entry.gold
+        # Build data set, one sample for each applied rule in
+        # the sequence of rules applied in this production
+        # *after* the matched regular expressions
+        prefix = []  # type: List[str]
+        for p in parse.production:
+            prefix.append(_rule_str(p))
+            samples.append((list(prefix), y))
+    return samples
+
+
+def _ctparse_gen_cached(
+    txt: str,
+    ts: datetime,
+    relative_match_len: float,
+    timeout: Union[float, int],
+    max_stack_depth: int,
+    scorer: Optional[Scorer],
+) -> Tuple[Optional[CTParse], ...]:
+    # ``ctparse_gen`` without latent time, corpora often contain the same text
+    # several times. Only deterministic parses are memoized: without a timeout and
+    # with the stateless DummyScorer, which is keyed by type because scorers sent
+    # to worker processes arrive as copies.
+    if timeout == 0 and type(scorer) is DummyScorer:
+        return _ctparse_gen_dummy_scorer(txt, ts, relative_match_len, max_stack_depth)
+    return tuple(
+        ctparse_gen(
+            txt,
+            ts,
             relative_match_len=relative_match_len,
             timeout=timeout,
             max_stack_depth=max_stack_depth,
             scorer=scorer,
             latent_time=False,
-        ):
-            # TODO: we should make sure ctparse_gen never returns None. If there is no
-            # result it should return an empty list
-            if parse is None:
-                continue
+        )
+    )
 
-            y = parse.resolution == entry.gold
-            # Build data set, one sample for each applied rule in
-            # the sequence of rules applied in this production
-            # *after* the matched regular expressions
-            for i in range(1, len(parse.production) + 1):
-                X = [str(p) for p in parse.production[:i]]
-                yield X, y
+
+@lru_cache(maxsize=1024)
+def _ctparse_gen_dummy_scorer(
+    txt: str, ts: datetime, relative_match_len: float, max_stack_depth: int
+) -> Tuple[Optional[CTParse], ...]:
+    return tuple(
+        ctparse_gen(
+            txt,
+            ts,
+            relative_match_len=relative_match_len,
+            timeout=0,
+            max_stack_depth=max_stack_depth,
+            scorer=_DUMMY_SCORER,
+            latent_time=False,
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def _corpus_ctparse_generator(
+    max_stack_depth: int, scorer: Optional[Scorer], relative_match_len: float = 1.0
+) -> Callable[[str, datetime], Tuple[Optional[CTParse], ...]]:
+    # Parse settings of the corpus tests are fixed, bind them once per combination.
+    # A partial of a module level function can be shipped to the worker processes.
+    return partial(
+        _ctparse_gen_cached,
+        relative_match_len=relative_match_len,
+        timeout=0,
+        max_stack_depth=max_stack_depth,
+        scorer=scorer,
+    )
+
+
+def _rule_str(p: Union[int, str]) -> str:
+    # Samples repeat the same few hundred rule names millions of times, share them
+    s = _RULE_STR_CACHE.get(p)
+    if s is None:
+        s = sys.intern(str(p))
+        _RULE_STR_CACHE[p] = s
+    return s
+
+
+def _intern_rules(Xs: Iterable[List[str]]) -> None:
+    # Unpickling the samples of a worker process creates new string objects,
+    # replace them in place to not copy each of the prefixes once more
+    for X in Xs:
+        X[:] = map(_rule_str, X)
+
+
+def _n_workers(max_workers: Optional[int]) -> int:
+    # Number of processes to use, defaults to the number of CPUs
+    return max_workers or os.cpu_count() or 1
+
+
+def _ordered_starmap(
+    fn: Callable[..., R], args: Iterable[Sequence[Any]], max_workers: Optional[int]
+) -> Generator[R, None, None]:
+    # Lazy, order preserving ``itertools.starmap`` over a process pool. Only a few
+    # tasks per process are submitted ahead of the consumer, pending tasks are
+    # cancelled when the generator is closed. A single worker runs in process.
+    n_workers = _n_workers(max_workers)
+    if n_workers == 1:
+        for a in args:
+            yield fn(*a)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        pending = deque()  # type: Deque[Future[R]]
+        try:
+            for a in args:
+                pending.append(executor.submit(fn, *a))
+                if len(pending) >= 2 * n_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
 
 
 def _progress_bar(
     it: Iterable[T], total: int, status_text: Callable[[T], str]
 ) -> Iterable[T]:
-    # Progress bar that can update text
-    pbar = tqdm(it, total=total)
+    # Progress bar that can update text, at most every `interval` seconds
+    interval = 0.1
+    pbar = tqdm(it, total=total, mininterval=interval)
+    last_update = 0.0
     for val in pbar:
-        pbar.set_description(status_text(val))
+        now = time.monotonic()
+        if now - last_update >= interval:
+            pbar.set_description(status_text(val), refresh=False)
+            last_update = now
         yield val
 
 
-def load_timeparse_corpus(fname: str) -> Sequence[TimeParseEntry]:
+def load_timeparse_corpus(fname: str, stream: bool = False) -> Sequence[TimeParseEntry]:
     """Load a corpus from disk.
 
     For more information about the format of the time parse corpus,
     refer to the documentation.
-    """
-    with open(fname, "r", encoding="utf-8") as fd:
-        entries = json.load(fd)
 
-    return [
-        TimeParseEntry(
-            text=e["text"],
-            ts=datetime.strptime(e["ref_time"], "%Y-%m-%dT%H:%M:%S"),
-            gold=parse_nb_string(e["gold_parse"]),
-        )
-        for e in entries
-    ]
+    By default the whole file is decoded at once, using ``orjson`` if it is
+    installed (``pip install ctparse[fast]``; fastest, but the raw bytes, the
+    decoded document and the entries are held in memory at the same time) and
+    ``json`` otherwise.
+
+    If `stream` is ``True``, the entries are decoded one at a time with ``ijson``,
+    which must be installed (``pip install ctparse[stream]``). This is slower, but
+    only the entries are held in memory, use it for corpora that are large compared
+    to the available memory.
+    """
+    with open(fname, "rb") as fd:
+        if stream:
+            if not _HAS_IJSON:
+                raise ImportError(
+                    "streaming a corpus requires ijson, "
+                    "install it with `pip install ctparse[stream]`"
+                )
+            entries = ijson.items(fd, "item")
+        elif _HAS_ORJSON:
+            entries = orjson.loads(fd.read())
+        else:
+            entries = json.load(fd)
+
+        return [
+            TimeParseEntry(
+                text=e["text"],
+                ts=datetime.fromisoformat(e["ref_time"]),
+                gold=parse_nb_string(e["gold_parse"]),
+            )
+            for e in entries
+        ]
 
 
 def parse_nb_string(gold_parse: str) -> Union[Time, Interval, Duration]:
@@ -137,69 +374,104 @@ def parse_nb_string(gold_parse: str) -> Union[Time, Interval, Duration]:
 
     The no-bound string representations are generated from ``Artifact.nb_str``.
     """
-    if gold_parse.startswith("Time"):
-        return Time.from_str(gold_parse[7:-1])
-    if gold_parse.startswith("Interval"):
-        return Interval.from_str(gold_parse[11:-1])
-    if gold_parse.startswith("Duration"):
-        return Duration.from_str(gold_parse[11:-1])
-    else:
+    name, sep, rest = gold_parse.partition("{")
+    if not sep or not rest.endswith("}") or name not in _NB_STRING_PARSERS:
         raise ValueError("'{}' has an invalid format".format(gold_parse))
+    return _NB_STRING_PARSERS[name](rest[:-1])
 
 
 def _run_corpus_one_test(
     target: str,
     ts_str: str,
-    tests: List[str],
-    ctparse_generator: Callable[[str, datetime], Iterator[Optional[CTParse]]],
-) -> Tuple[List[List[str]], List[bool], int, int, int, int, int, bool]:
-    ts = datetime.strptime(ts_str, "%Y-%m-%dT%H:%M")
-    all_tests_pass = True
+    tests: Sequence[str],
+    ctparse_generator: Callable[[str, datetime], Iterable[Optional[CTParse]]],
+    emit_dataset: bool = True,
+) -> Tuple[List[List[str]], List[bool], _CorpusStats, List[str]]:
+    ts = datetime.fromisoformat(ts_str)
     Xs = []
     ys = []
-    pos_parses = neg_parses = pos_first_parses = pos_best_scored = total_tests = 0
+    pos_parses = neg_parses = pos_first_parses = pos_best_scored = 0
 
-    at_least_one_failed = False
+    failed_tests = []
     for test in tests:
-        one_prod_passes = False
-        first_prod = True
-        y_score = []
-        for parse in ctparse_generator(test, ts):
-            assert parse is not None
+        (
+            Xs_,
+            ys_,
+            one_prod_passes,
+            pos_parses_,
+            neg_parses_,
+            pos_first_parses_,
+            best_y,
+        ) = _run_one_test(test, target, ts, ctparse_generator, emit_dataset)
+        Xs.extend(Xs_)
+        ys.extend(ys_)
+        pos_parses += pos_parses_
+        neg_parses += neg_parses_
+        pos_first_parses += pos_first_parses_
+        pos_best_scored += int(best_y)
+        if not one_prod_passes:
+            failed_tests.append(test)
+    stats = _CorpusStats(
+        len(tests), pos_parses, neg_parses, pos_first_parses, pos_best_scored
+    )
+    return Xs, ys, stats, failed_tests
+
 
-            y = parse.resolution.nb_str() == target
+def _run_one_test(
+    test: str,
+    target: str,
+    ts: datetime,
+    ctparse_generator: Callable[[str, datetime], Iterable[Optional[CTParse]]],
+    emit_dataset: bool,
+) -> Tuple[List[List[str]], List[bool], bool, int, int, int, bool]:
+    Xs = []  # type: List[List[str]]
+    ys = []  # type: List[bool]
+    # bound once, this is the innermost loop when building data sets
+    Xs_append = Xs.append
+    ys_append = ys.append
+    pos_parses = neg_parses = pos_first_parses = 0
+    one_prod_passes = False
+    first_prod = True
+    # only resolutions of the target's type need to be formatted for comparison
+    target_type = target.partition("[")[0]
+    # correctness of the highest scored parse
+    best_score = float("-inf")
+    best_y = False
+    for parse in ctparse_generator(test, ts):
+        assert parse is not None
+
+        y = (
+            type(parse.resolution).__name__ == target_type
+            and parse.resolution.nb_str() == target
+        )
+        if emit_dataset:
             # Build data set, one sample for each applied rule in
             # the sequence of rules applied in this production
             # *after* the matched regular expressions
-            for i in range(1, len(parse.production) + 1):
-                Xs.append([str(p) for p in parse.production[:i]])
-                ys.append(y)
-
-            one_prod_passes |= y
-            pos_parses += int(y)
-            neg_parses += int(not y)
-            pos_first_parses += int(y and first_prod)
-            first_prod = False
-            y_score.append((parse.score, y))
-        if not one_prod_passes:
-            logger.warning(
-                'failure: target "{}" never produced in "{}"'.format(target, test)
-            )
-        pos_best_scored += int(max(y_score, key=lambda x: x[0])[1])
-        total_tests += len(tests)
-        all_tests_pass &= one_prod_passes
-    if not all_tests_pass:
-        logger.warning('failure: "{}" not always produced'.format(target))
-        at_least_one_failed = True
+            prefix = []  # type: List[str]
+            for p in parse.production:
+                prefix.append(_rule_str(p))
+                Xs_append(list(prefix))
+                ys_append(y)
+
+        if y:
+            one_prod_passes = True
+            pos_parses += 1
+            pos_first_parses += first_prod
+        else:
+            neg_parses += 1
+        first_prod = False
+        if parse.score > best_score:
+            best_score = parse.score
+            best_y = y
     return (
         Xs,
         ys,
-        total_tests,
+        one_prod_passes,
         pos_parses,
         neg_parses,
         pos_first_parses,
-        pos_best_scored,
-        at_least_one_failed,
+        best_y,
     )
 
 
@@ -218,17 +490,13 @@ def run_single_test(target: str, ts: str, test: str) -> None:
         Test case
     """
 
-    def ctparse_generator(test: str, ts: datetime) -> Iterator[Optional[CTParse]]:
-        return ctparse_gen(
-            test,
-            ts,
-            relative_match_len=1.0,
-            timeout=0,
-            max_stack_depth=100,
-            latent_time=False,
-        )
-
-    res = _run_corpus_one_test(target, ts, [test], ctparse_generator)
+    res = _run_corpus_one_test(
+        target,
+        ts,
+        [test],
+        _corpus_ctparse_generator(max_stack_depth=100, scorer=None),
+        emit_dataset=False,
+    )
     if res[-1]:
         raise Exception(
             'failure: target "{}" never produced in "{}"'.format(target, test)
@@ -236,8 +504,11 @@ def run_single_test(target: str, ts: str, test: str) -> None:
 
 
 def run_corpus(
-    corpus: Sequence[Tuple[str, str, Sequence[str]]]
-) -> Tuple[List[List[str]], List[bool]]:
+    corpus: Sequence[Tuple[str, str, Sequence[str]]],
+    max_workers: Optional[int] = None,
+    emit_dataset: bool = True,
+    fast_fail: bool = False,
+) -> Tuple[List[List[str]], "array[int]"]:
     """Load the corpus (currently hard coded), run it through ctparse with
     no timeout and no limit on the stack depth.
 
@@ -256,72 +527,147 @@ def run_corpus(
     [r_0, ..., r_n, p_0, ..., p_m, 'step_m']
 
     All samples from one production are given the same label which indicates if
-    the production was correct.
+    the production was correct. The labels are returned as an ``array.array`` of
+    0/1 bytes, which is far more compact than a list for large corpora.
+
+    Targets are run in parallel using up to `max_workers` processes (defaults
+    to the number of CPUs), `max_workers=1` runs them in this process. The samples
+    are returned in the order of `corpus`.
+
+    If only the pass/fail result is needed, set `emit_dataset` to ``False`` to
+    skip building the data set; an empty list and an empty array are returned in
+    that case.
+
+    A ``CorpusFailure`` is raised if the corpus fails. By default all targets are
+    run first, with `fast_fail` set to ``True`` it is raised for the first failing
+    target and the remaining targets are cancelled.
 
     To build a similar datasets without the strict checking, use
     `make_partial_rule_dataset`
     """
+    Xs = []  # type: List[List[str]]
+    ys = array("b")  # 0/1 labels, one byte each
+    for Xs_, ys_ in _iter_corpus_batches(corpus, max_workers, emit_dataset, fast_fail):
+        Xs.extend(Xs_)
+        ys.extend(ys_)
+    return Xs, ys
+
+
+def iter_corpus_samples(
+    corpus: Sequence[Tuple[str, str, Sequence[str]]],
+    max_workers: Optional[int] = None,
+    emit_dataset: bool = True,
+    fast_fail: bool = False,
+) -> Iterator[Tuple[List[str], bool]]:
+    """Same as `run_corpus`, but yield the samples (X, y) as soon as the
+    tests for a target are done.
+
+    Only the samples of the targets being run or not consumed yet are held in
+    memory, which allows to stream the data set of a large corpus, e.g. to disk.
+    The statistics are logged and the exception for a failing corpus is raised
+    once all the samples have been consumed.
+    """
+    for Xs, ys in _iter_corpus_batches(corpus, max_workers, emit_dataset, fast_fail):
+        yield from zip(Xs, ys)
+
+
+def _iter_corpus_batches(
+    corpus: Sequence[Tuple[str, str, Sequence[str]]],
+    max_workers: Optional[int],
+    emit_dataset: bool,
+    fast_fail: bool,
+) -> Iterator[Tuple[List[List[str]], List[bool]]]:
+    # Yield the samples of each task in corpus order, see iter_corpus_samples
     at_least_one_failed = False
+    # counters of each target, summed up once all targets are done
+    stats = []  # type: List[_CorpusStats]
+
+    ctparse_generator = _corpus_ctparse_generator(
+        max_stack_depth=0, scorer=_DUMMY_SCORER
+    )
+
+    run_tests = partial(
+        _run_corpus_one_test,
+        ctparse_generator=ctparse_generator,
+        emit_dataset=emit_dataset,
+    )
+    n_workers = _n_workers(max_workers)
+    # With fewer targets than processes, each test is run as a task of its own
+    split_tests = len(corpus) < n_workers
+    tasks = [
+        (i, target, ts, chunk)
+        for i, (target, ts, tests) in enumerate(corpus)
+        for chunk in (
+            [tests[j : j + 1] for j in range(len(tests))] if split_tests else [tests]
+        )
+    ]
+    results = _ordered_starmap(run_tests, (task[1:] for task in tasks), n_workers)
+    try:
+        # the tasks of a corpus entry are consecutive
+        for i, task_results in tqdm(
+            groupby(zip(tasks, results), key=lambda task_result: task_result[0][0]),
+            total=len(corpus),
+        ):
+            target = corpus[i][0]
+            target_results = [result for _, result in task_results]
+            failed_tests = [
+                test
+                for _, _, _, failed_tests_ in target_results
+                for test in failed_tests_
+            ]
+            if failed_tests:
+                at_least_one_failed = True
+                # a single record per target, formatted only if it is emitted
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(
+                        'failure: "%s" not always produced, never produced in %s',
+                        target,
+                        ", ".join('"{}"'.format(test) for test in failed_tests),
+                    )
+                if fast_fail:
+                    raise CorpusFailure(
+                        'failure: "{}" not always produced'.format(target)
+                    )
+            for Xs_, ys_, stats_, _ in target_results:
+                if n_workers != 1:
+                    _intern_rules(Xs_)
+                yield Xs_, ys_
+                stats.append(stats_)
+    finally:
+        # cancel the targets that are not run yet
+        results.close()
+
     # pos_parses: number of parses that are correct
     # neg_parses: number of parses that are wrong
     # pos_first_parses: number of first parses generated that are correct
     # pos_best_scored: number of correct parses that have the best score
-    pos_parses = neg_parses = pos_first_parses = pos_best_scored = 0
-    total_tests = 0
-    Xs = []
-    ys = []
-
-    def ctparse_generator(test: str, ts: datetime) -> Iterator[Optional[CTParse]]:
-        return ctparse_gen(
-            test,
-            ts,
-            relative_match_len=1.0,
-            timeout=0,
-            max_stack_depth=0,
-            scorer=DummyScorer(),
-            latent_time=False,
-        )
-
-    for target, ts, tests in tqdm(corpus):
-        (
-            Xs_,
-            ys_,
-            total_tests_,
-            pos_parses_,
-            neg_parses_,
-            pos_first_parses_,
-            pos_best_scored_,
-            at_least_one_failed_,
-        ) = _run_corpus_one_test(target, ts, tests, ctparse_generator)
-        Xs.extend(Xs_)
-        ys.extend(ys_)
-        total_tests += total_tests_
-        pos_parses += pos_parses_
-        neg_parses += neg_parses_
-        pos_first_parses += pos_first_parses_
-        pos_best_scored += pos_best_scored_
-        at_least_one_failed = at_least_one_failed or at_least_one_failed_
+    # (the zero row keeps the sums defined for an empty corpus)
+    total_tests, pos_parses, neg_parses, pos_first_parses, pos_best_scored = (
+        sum(counts) for counts in zip(_CorpusStats(0, 0, 0, 0, 0), *stats)
+    )
     logger.info(
         "run {} tests on {} targets with a total of "
         "{} positive and {} negative parses (={})".format(
             total_tests, len(corpus), pos_parses, neg_parses, pos_parses + neg_parses
         )
     )
-    logger.info(
-        "share of correct parses in all parses: {:.2%}".format(
-            pos_parses / (pos_parses + neg_parses)
+    # the shares are not defined without any parses or tests
+    if pos_parses + neg_parses:
+        logger.info(
+            "share of correct parses in all parses: {:.2%}".format(
+                pos_parses / (pos_parses + neg_parses)
+            )
         )
-    )
-    logger.info(
-        "share of correct parses being produced first: {:.2%}".format(
-            pos_first_parses / (pos_parses + neg_parses)
+        logger.info(
+            "share of correct parses being produced first: {:.2%}".format(
+                pos_first_parses / (pos_parses + neg_parses)
+            )
         )
-    )
-    logger.info(
-        "share of correct parses being scored highest: {:.2%}".format(
-            pos_best_scored / total_tests
+    if total_tests:
+        logger.info(
+            "share of correct parses being scored highest: {:.2%}".format(
+                pos_best_scored / total_tests
+            )
         )
-    )
     if at_least_one_failed:
-        raise Exception("ctparse corpus has errors")
-    return Xs, ys
+        raise CorpusFailure("ctparse corpus has errors")
@@ -42,6 +42,10 @@ setup(
         "regex>=2018.6.6",
         "tqdm>=4.23.4,<5.0.0",
     ],
+    extras_require={
+        "fast": ["orjson"],
+        "stream": ["ijson"],
+    },
     license="MIT license",
     long_description=readme + "\n\n" + history,
     include_package_data=True,
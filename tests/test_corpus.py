@@ -1,16 +1,26 @@
+import logging
 from datetime import datetime
+from functools import partial
+from typing import List, Tuple
 
 import pytest
 
+import ctparse.corpus
 from ctparse.corpus import (
+    CorpusFailure,
     TimeParseEntry,
+    _ctparse_gen_cached,
+    _ctparse_gen_dummy_scorer,
+    _run_corpus_one_test,
+    iter_corpus_samples,
     load_timeparse_corpus,
     make_partial_rule_dataset,
     parse_nb_string,
     run_corpus,
     run_single_test,
 )
-from ctparse.scorer import DummyScorer
+from ctparse.ctparse import ctparse_gen
+from ctparse.scorer import DummyScorer, RandomScorer
 from ctparse.time.corpus import corpus
 from ctparse.types import Interval, Time
 
@@ -53,6 +63,61 @@ def test_run_corpus_failure() -> None:
         run_corpus(fail_corpus)
 
 
+def test_run_corpus_failure_warning(caplog) -> None:
+    fail_corpus = [("never produced", "2015-12-12T12:30", ("today", "heute"))]
+    with pytest.raises(CorpusFailure):
+        run_corpus(fail_corpus, max_workers=1)
+
+    warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert warnings[0].getMessage() == (
+        'failure: "never produced" not always produced, '
+        'never produced in "today", "heute"'
+    )
+
+
+def test_run_corpus_fast_fail() -> None:
+    fail_corpus = [
+        ("never produced", "2015-12-12T12:30", ("today",)),
+        ("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today",)),
+    ]
+    with pytest.raises(CorpusFailure, match="never produced"):
+        run_corpus(fail_corpus, fast_fail=True)
+
+
+def test_run_corpus_no_dataset() -> None:
+    corpus = [("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today",))]
+
+    Xs, ys = run_corpus(corpus, emit_dataset=False)
+
+    assert Xs == []
+    assert len(ys) == 0
+
+
+@pytest.mark.parametrize(
+    "corpus", [[], [("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ())]]
+)
+def test_run_corpus_empty(corpus) -> None:
+    Xs, ys = run_corpus(corpus)
+
+    assert Xs == []
+    assert len(ys) == 0
+
+
+def test_iter_corpus_samples() -> None:
+    corpus = [
+        ("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today", "heute")),
+        ("Time[]{2019-01-01 X:X (X/X)}", "2018-12-31T12:43", ("morgen",)),
+    ]
+
+    samples = list(iter_corpus_samples(corpus, max_workers=2))
+    Xs, ys = run_corpus(corpus, max_workers=1)
+
+    assert samples == [(X, bool(y)) for X, y in zip(Xs, ys)]
+    assert isinstance(samples[0][0][0], str)
+    assert any(y for _, y in samples)
+
+
 def test_make_partial_rule_dataset() -> None:
     ts = datetime(year=2019, month=10, day=1)
     entries = [
@@ -70,6 +135,84 @@ def test_make_partial_rule_dataset() -> None:
     assert isinstance(X[0][0], str)
 
 
+def test_make_partial_rule_dataset_parallel() -> None:
+    ts = datetime(year=2019, month=10, day=1)
+    # more entries than fit into a single chunk of work
+    entries = [
+        TimeParseEntry(
+            "today at {} pm".format(hour),
+            ts,
+            Time(year=2019, month=10, day=1, hour=12 + hour, minute=0),
+        )
+        for hour in range(1, 12)
+    ] * 2
+
+    def dataset(max_workers: int) -> List[Tuple[List[str], bool]]:
+        return list(
+            make_partial_rule_dataset(
+                entries,
+                timeout=0,
+                max_stack_depth=0,
+                scorer=DummyScorer(),
+                max_workers=max_workers,
+            )
+        )
+
+    assert dataset(max_workers=2) == dataset(max_workers=1)
+
+
+@pytest.mark.parametrize(
+    "corpus",
+    [
+        # one task per target
+        [
+            ("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today", "heute")),
+            ("Time[]{2019-01-01 X:X (X/X)}", "2018-12-31T12:43", ("morgen",)),
+        ],
+        # fewer targets than processes, one task per test
+        [("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today", "heute"))],
+    ],
+)
+def test_run_corpus_parallel(corpus) -> None:
+    Xs, ys = run_corpus(corpus, max_workers=2)
+    Xs_serial, ys_serial = run_corpus(corpus, max_workers=1)
+
+    assert Xs == Xs_serial
+    assert ys == ys_serial
+
+
+def test_run_corpus_single_cpu(monkeypatch) -> None:
+    corpus = [
+        ("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today", "heute")),
+    ]
+    Xs_serial, ys_serial = run_corpus(corpus, max_workers=1)
+    monkeypatch.setattr(ctparse.corpus.os, "cpu_count", lambda: 1)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a single CPU runs in process")
+
+    monkeypatch.setattr(ctparse.corpus, "ProcessPoolExecutor", no_pool)
+
+    Xs, ys = run_corpus(corpus)
+
+    assert Xs == Xs_serial
+    assert ys == ys_serial
+
+
+def test_run_corpus_parallel_interned() -> None:
+    corpus = [
+        ("Time[]{2018-03-07 X:X (X/X)}", "2018-03-07T12:43", ("today",)),
+        ("Time[]{2018-03-08 X:X (X/X)}", "2018-03-08T12:43", ("today",)),
+    ]
+
+    Xs, _ = run_corpus(corpus, max_workers=2)
+
+    # the same rule sent back by different processes is a single string object
+    X1, X2 = Xs[0], Xs[-1]
+    assert X1[0] == X2[0]
+    assert X1[0] is X2[0]
+
+
 def test_parse_nb_string() -> None:
     t = Time(year=1, month=1, day=1, hour=1, minute=1, DOW=1, POD="pod")
 
@@ -79,6 +222,14 @@ def test_parse_nb_string() -> None:
     )
 
 
+@pytest.mark.parametrize(
+    "gold_parse", ["Time", "Time[]{X-X-X X:X (X/X)", "Date[]{X-X-X X:X (X/X)}"]
+)
+def test_parse_nb_string_invalid(gold_parse) -> None:
+    with pytest.raises(ValueError):
+        parse_nb_string(gold_parse)
+
+
 def test_load_timeparse_corpus(tmp_path) -> None:
     path = tmp_path / "test.json"
     path.write_text(CORPUS_JSON, encoding="utf-8")
@@ -86,3 +237,93 @@ def test_load_timeparse_corpus(tmp_path) -> None:
     result = load_timeparse_corpus(str(path))
 
     assert len(result) == 2
+
+
+def _check_loaded_corpus(result) -> None:
+    assert [entry.text for entry in result] == [
+        "Donnerstag, den 05.10. ca 6:55",
+        "22.05.2017 früh",
+    ]
+    assert result[0].ts == datetime(2017, 9, 25, 16, 6, 55)
+    assert result[1].gold == Time(year=2017, month=5, day=22, POD="earlymorning")
+
+
+def test_load_timeparse_corpus_json(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "test.json"
+    path.write_text(CORPUS_JSON, encoding="utf-8")
+    monkeypatch.setattr(ctparse.corpus, "_HAS_ORJSON", False)
+
+    _check_loaded_corpus(load_timeparse_corpus(str(path)))
+
+
+def test_load_timeparse_corpus_orjson(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("orjson")
+    path = tmp_path / "test.json"
+    path.write_text(CORPUS_JSON, encoding="utf-8")
+    monkeypatch.setattr(ctparse.corpus, "_HAS_ORJSON", True)
+
+    _check_loaded_corpus(load_timeparse_corpus(str(path)))
+
+
+def test_load_timeparse_corpus_ijson(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("ijson")
+    path = tmp_path / "test.json"
+    path.write_text(CORPUS_JSON, encoding="utf-8")
+    monkeypatch.setattr(ctparse.corpus, "_HAS_IJSON", True)
+
+    _check_loaded_corpus(load_timeparse_corpus(str(path), stream=True))
+
+
+def test_run_corpus_one_test_multiple_tests() -> None:
+    ctparse_generator = partial(
+        ctparse_gen,
+        relative_match_len=1.0,
+        timeout=0,
+        max_stack_depth=0,
+        scorer=DummyScorer(),
+        latent_time=False,
+    )
+    Xs, ys, stats, failed_tests = _run_corpus_one_test(
+        "Time[]{2018-03-07 X:X (X/X)}",
+        "2018-03-07T12:43",
+        ["heute", "today"],
+        ctparse_generator,
+    )
+
+    assert len(Xs) == len(ys) > 0
+    assert stats.total_tests == 2
+    assert any(ys)
+    assert failed_tests == []
+
+
+def test_ctparse_gen_cached_dummy_scorer() -> None:
+    ts = datetime(year=2019, month=10, day=1)
+    _ctparse_gen_dummy_scorer.cache_clear()
+
+    # scorers sent to worker processes are copies, they still share the cache
+    first = _ctparse_gen_cached("today 5pm", ts, 1.0, 0, 0, DummyScorer())
+    second = _ctparse_gen_cached("today 5pm", ts, 1.0, 0, 0, DummyScorer())
+
+    assert first is second
+    assert _ctparse_gen_dummy_scorer.cache_info().hits == 1
+
+
+@pytest.mark.parametrize("timeout,scorer", [(1, DummyScorer()), (0, RandomScorer())])
+def test_ctparse_gen_cached_not_deterministic(timeout, scorer) -> None:
+    ts = datetime(year=2019, month=10, day=1)
+    _ctparse_gen_dummy_scorer.cache_clear()
+
+    first = _ctparse_gen_cached("today 5pm", ts, 1.0, timeout, 0, scorer)
+    second = _ctparse_gen_cached("today 5pm", ts, 1.0, timeout, 0, scorer)
+
+    assert first is not second
+    assert _ctparse_gen_dummy_scorer.cache_info().currsize == 0
+
+
+def test_load_timeparse_corpus_stream_requires_ijson(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "test.json"
+    path.write_text(CORPUS_JSON, encoding="utf-8")
+    monkeypatch.setattr(ctparse.corpus, "_HAS_IJSON", False)
+
+    with pytest.raises(ImportError):
+        load_timeparse_corpus(str(path), stream=True)